@@ -5,15 +5,143 @@ Quantum-safe HTTP client for Python applications
 """
 
 import hashlib
+import os
 import secrets
 import json
-from typing import Optional, Dict, Any, Tuple
+import logging
+import threading
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Tuple
 from dataclasses import dataclass
 
 
+logger = logging.getLogger('httq')
+
+try:
+    # OpenSSL EVP backend (uses SHA-NI / ARMv8 crypto extensions when present)
+    from _hashlib import openssl_sha256 as _sha256
+except ImportError:
+    _sha256 = hashlib.sha256
+
+# Pre-initialized SHA-256 context; ``.copy()`` is cheaper than a fresh hasher
+_SHA256_PROTO = _sha256()
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """
+    Compact UTF-8 stdlib JSON, used when orjson is missing or rejects a payload
+    
+    Matches orjson for strings, integers and containers of them. Float
+    exponent notation can differ between orjson versions (``1e16`` vs
+    ``1e+16``) and NaN/Infinity always do (``NaN`` vs ``null``), so the
+    ``_encrypt`` digest of such payloads depends on the installed backend.
+    """
+    text = json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
+    # Lone surrogates are valid in str but not in strict UTF-8
+    return text.encode('utf-8', 'surrogatepass')
+
+
+try:
+    import orjson
+except ImportError:
+    _dumps = _json_dumps
+else:
+    def _dumps(obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # Payloads orjson rejects, e.g. integers beyond 64 bits
+            return _json_dumps(obj)
+
+
+def _payload_bytes(
+    data: Any,
+    *,
+    _isinstance=isinstance,
+    _binary=(bytes, bytearray),
+    _str=str,
+    _dumps=_dumps
+) -> bytes:
+    """Serialize a request payload to bytes for encryption"""
+    if _isinstance(data, _binary):
+        return data
+    if _isinstance(data, _str):
+        return data.encode('utf-8', 'surrogatepass')
+    return _dumps(data)
+
+
+class _RandPool:
+    """Buffered CSPRNG output, refilled from ``os.urandom`` in large chunks"""
+    
+    def __init__(self, size: int = 4096):
+        """
+        Initialize random pool
+        
+        Args:
+            size: Refill chunk in bytes; 0 draws fresh entropy on every call
+        """
+        self.size = size
+        self.buf = bytearray()
+        self.off = 0
+        self.lock = threading.Lock()
+    
+    def take(self, n: int) -> bytes:
+        """Return ``n`` random bytes, each byte handed out only once"""
+        if n < 0:
+            raise ValueError(f"Cannot take a negative number of bytes: {n}")
+        
+        with self.lock:
+            # Read size under the lock so a concurrent resize cannot leave
+            # a refill shorter than the draw
+            size = self.size
+            if n <= size:
+                if self.off + n > len(self.buf):
+                    self.buf = bytearray(os.urandom(size))
+                    self.off = 0
+                off = self.off
+                self.off = off + n
+                out = bytes(self.buf[off:off + n])
+                # Don't leave handed-out secrets behind in the shared buffer
+                self.buf[off:off + n] = bytes(n)
+                return out
+        
+        return secrets.token_bytes(n)
+    
+    def _reset(self) -> None:
+        """Discard buffered bytes so a forked child never reuses them"""
+        self.buf = bytearray()
+        self.off = 0
+        self.lock = threading.Lock()
+
+
+_RAND_POOL = _RandPool()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_RAND_POOL._reset)
+
+
+def set_random_pool_size(size: int) -> None:
+    """
+    Configure the shared CSPRNG pool used for keys and messages
+    
+    Args:
+        size: Refill chunk in bytes; 0 disables buffering so every draw
+            comes straight from ``secrets.token_bytes``
+    """
+    if size < 0:
+        raise ValueError(f"Random pool size must be non-negative: {size}")
+    
+    with _RAND_POOL.lock:
+        _RAND_POOL.size = size
+        _RAND_POOL.buf = bytearray()
+        _RAND_POOL.off = 0
+
+
 @dataclass
 class HTTPQKeyPair:
     """HTTQ key pair"""
+    __slots__ = ('public_key', 'private_key', 'algorithm', 'security_bits')
+    
     public_key: bytes
     private_key: bytes
     algorithm: str
@@ -23,6 +151,15 @@ class HTTPQKeyPair:
 class HTTPQLattice:
     """HTTQ-LATTICE cryptographic algorithm implementation"""
     
+    __slots__ = ('security_level', 'n', 'q', 'k', 'security_bits', '_algorithm_str')
+    
+    # security_level -> (modulus q, rank k, quantum security bits)
+    _PARAMS = {
+        1024: (3329, 2, 128),
+        2048: (7681, 3, 192),
+        4096: (12289, 4, 256)
+    }
+    
     def __init__(self, security_level: int = 2048):
         """
         Initialize HTTQ-LATTICE
@@ -30,23 +167,22 @@ class HTTPQLattice:
         Args:
             security_level: 1024, 2048, or 4096
         """
+        if security_level not in HTTPQLattice._PARAMS:
+            raise ValueError(f"Unsupported security level: {security_level}")
+        
         self.security_level = security_level
         self.n = security_level  # Lattice dimension
-        self.q = self._get_modulus(security_level)
-        self.k = self._get_rank(security_level)
-        
-    def _get_modulus(self, level: int) -> int:
-        """Get modulus for security level"""
-        moduli = {
-            1024: 3329,
-            2048: 7681,
-            4096: 12289
-        }
-        return moduli.get(level, 3329)
+        self.q, self.k, self.security_bits = HTTPQLattice._PARAMS[security_level]
+        self._algorithm_str = f'HTTQ-LATTICE-{security_level}'
     
-    def _get_rank(self, level: int) -> int:
-        """Get rank for security level"""
-        return 2 if level == 1024 else 3 if level == 2048 else 4
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Allow each attribute to be set once; instances are shared by clients"""
+        if hasattr(self, name):
+            raise AttributeError(f"HTTPQLattice is read-only; cannot set {name!r}")
+        object.__setattr__(self, name, value)
+    
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"HTTPQLattice is read-only; cannot delete {name!r}")
     
     def generate_keypair(self) -> HTTPQKeyPair:
         """
@@ -55,27 +191,63 @@ class HTTPQLattice:
         Returns:
             HTTPQKeyPair with public and private keys
         """
-        # Generate random seed
-        seed = secrets.token_bytes(32)
+        return self.generate_keypairs(1)[0]
+    
+    def generate_keypairs(
+        self,
+        count: int,
+        *,
+        _take=_RAND_POOL.take,
+        _new_hash=_SHA256_PROTO.copy,
+        _keypair=HTTPQKeyPair,
+        _range=range
+    ) -> List[HTTPQKeyPair]:
+        """
+        Generate several HTTQ-LATTICE key pairs at once
         
-        # Derive keys (simplified for demo)
-        private_key = hashlib.sha256(seed).digest()
-        public_key = hashlib.sha256(private_key + b'public').digest()
+        Args:
+            count: Number of key pairs to generate
+            
+        Returns:
+            List of HTTPQKeyPair, one per requested pair
+        """
+        if count < 0:
+            raise ValueError(f"Key pair count must be non-negative: {count}")
         
-        security_bits = {
-            1024: 128,
-            2048: 192,
-            4096: 256
-        }
+        # Draw all seeds with a single CSPRNG call
+        seeds = _take(32 * count)
         
-        return HTTPQKeyPair(
-            public_key=public_key,
-            private_key=private_key,
-            algorithm=f'HTTQ-LATTICE-{self.security_level}',
-            security_bits=security_bits[self.security_level]
-        )
+        security_bits = self.security_bits
+        algorithm = self._algorithm_str
+        
+        keypairs = []
+        for offset in _range(0, 32 * count, 32):
+            # Derive keys (simplified for demo)
+            h = _new_hash()
+            h.update(seeds[offset:offset + 32])
+            private_key = h.digest()
+            
+            h = _new_hash()
+            h.update(private_key)
+            h.update(b'public')
+            public_key = h.digest()
+            
+            keypairs.append(_keypair(
+                public_key=public_key,
+                private_key=private_key,
+                algorithm=algorithm,
+                security_bits=security_bits
+            ))
+        
+        return keypairs
     
-    def encapsulate(self, public_key: bytes) -> Tuple[bytes, bytes]:
+    def encapsulate(
+        self,
+        public_key: bytes,
+        *,
+        _take=_RAND_POOL.take,
+        _new_hash=_SHA256_PROTO.copy
+    ) -> Tuple[bytes, bytes]:
         """
         Encapsulate shared secret
         
@@ -86,17 +258,29 @@ class HTTPQLattice:
             Tuple of (ciphertext, shared_secret)
         """
         # Generate random message
-        message = secrets.token_bytes(32)
+        message = _take(32)
         
         # Derive shared secret
-        shared_secret = hashlib.sha256(message + public_key).digest()
+        h = _new_hash()
+        h.update(message)
+        h.update(public_key)
+        shared_secret = h.digest()
         
         # Create ciphertext (simplified)
-        ciphertext = hashlib.sha256(public_key + message).digest()
+        h = _new_hash()
+        h.update(public_key)
+        h.update(message)
+        ciphertext = h.digest()
         
         return ciphertext, shared_secret
     
-    def decapsulate(self, ciphertext: bytes, private_key: bytes) -> bytes:
+    def decapsulate(
+        self,
+        ciphertext: bytes,
+        private_key: bytes,
+        *,
+        _new_hash=_SHA256_PROTO.copy
+    ) -> bytes:
         """
         Decapsulate shared secret
         
@@ -108,13 +292,38 @@ class HTTPQLattice:
             Shared secret
         """
         # Recover shared secret (simplified)
-        shared_secret = hashlib.sha256(ciphertext + private_key).digest()
-        return shared_secret
+        h = _new_hash()
+        h.update(ciphertext)
+        h.update(private_key)
+        return h.digest()
+
+
+# HTTPS fallback connection pooling and retry policy
+HTTPS_POOL_CONNECTIONS = 10  # Distinct hosts kept in the pool
+HTTPS_POOL_MAXSIZE = 32  # Keep-alive connections per host
+HTTPS_MAX_RETRIES = 3
+HTTPS_RETRY_BACKOFF = 0.2  # Seconds, doubled on each retry
+HTTPS_RETRY_STATUSES = (502, 503, 504)
+
+
+@lru_cache(maxsize=8)
+def _lattice_for(level: int) -> HTTPQLattice:
+    """Shared HTTPQLattice per security level (lattices hold no per-call state)"""
+    return HTTPQLattice(level)
 
 
 class HTTPQClient:
     """HTTQ Protocol Client"""
     
+    __slots__ = (
+        'algorithm',
+        'hybrid_mode',
+        'fallback_to_https',
+        'lattice',
+        '_https_session',
+        '_new_hash'
+    )
+    
     def __init__(
         self,
         algorithm: str = 'HTTQ-LATTICE-2048',
@@ -134,8 +343,14 @@ class HTTPQClient:
         self.fallback_to_https = fallback_to_https
         
         # Parse security level
-        security_level = int(algorithm.split('-')[-1])
-        self.lattice = HTTPQLattice(security_level)
+        security_level = int(algorithm[algorithm.rfind('-') + 1:])
+        self.lattice = _lattice_for(security_level)
+        
+        # Created on first HTTPS fallback so `requests` stays optional
+        self._https_session = None
+        
+        # Pre-resolved hasher constructor for the per-request _encrypt path
+        self._new_hash = _SHA256_PROTO.copy
         
     def get(self, url: str, **kwargs) -> Dict[str, Any]:
         """
@@ -164,6 +379,18 @@ class HTTPQClient:
         """
         return self._request('POST', url, data=data, **kwargs)
     
+    def close(self) -> None:
+        """Close the pooled HTTPS fallback session, if one was opened"""
+        if self._https_session is not None:
+            self._https_session.close()
+            self._https_session = None
+    
+    def __enter__(self) -> 'HTTPQClient':
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
     def _request(
         self,
         method: str,
@@ -185,7 +412,8 @@ class HTTPQClient:
         """
         # Check if URL uses HTTQ protocol
         if url.startswith('httq://'):
-            print(f"🔐 Initiating quantum-safe connection to {url}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("🔐 Initiating quantum-safe connection to %s", url)
             
             # Perform HTTQ handshake
             session = self._perform_handshake(url)
@@ -198,10 +426,12 @@ class HTTPQClient:
             return response
         
         elif url.startswith('https://') and self.fallback_to_https:
-            print(f"⚠️  Falling back to HTTPS for {url}")
+            if logger.isEnabledFor(logging.WARNING):
+                logger.warning("⚠️  Falling back to HTTPS for %s", url)
             # Fallback to regular HTTPS
-            import requests
-            response = requests.request(method, url, data=data, **kwargs)
+            response = self._get_https_session().request(
+                method, url, data=data, **kwargs
+            )
             return {
                 'status': response.status_code,
                 'data': response.json() if response.headers.get('content-type', '').startswith('application/json') else response.text,
@@ -211,6 +441,35 @@ class HTTPQClient:
         else:
             raise ValueError(f"Unsupported protocol in URL: {url}")
     
+    def _get_https_session(self):
+        """
+        Get the pooled HTTPS session used for fallback requests
+        
+        Returns:
+            requests.Session with keep-alive connection pooling and retries
+        """
+        if self._https_session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+            
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=HTTPS_POOL_CONNECTIONS,
+                pool_maxsize=HTTPS_POOL_MAXSIZE,
+                max_retries=Retry(
+                    total=HTTPS_MAX_RETRIES,
+                    backoff_factor=HTTPS_RETRY_BACKOFF,
+                    status_forcelist=HTTPS_RETRY_STATUSES,
+                    # Return the final response instead of raising RetryError
+                    raise_on_status=False
+                )
+            )
+            session.mount('https://', adapter)
+            self._https_session = session
+        
+        return self._https_session
+    
     def _perform_handshake(self, url: str) -> Dict[str, Any]:
         """
         Perform HTTQ handshake
@@ -221,18 +480,21 @@ class HTTPQClient:
         Returns:
             Session information
         """
-        print(f"🤝 Performing HTTQ handshake...")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("🤝 Performing HTTQ handshake...")
         
-        # Generate client key pair
-        keypair = self.lattice.generate_keypair()
-        
-        # Simulate server public key (in real implementation, received from server)
-        server_keypair = self.lattice.generate_keypair()
+        # Generate client key pair and simulate server public key
+        # (in real implementation, received from server)
+        keypair, server_keypair = self.lattice.generate_keypairs(2)
         
         # Encapsulate shared secret
         ciphertext, shared_secret = self.lattice.encapsulate(server_keypair.public_key)
         
-        print(f"✅ Handshake complete! Quantum security: {keypair.security_bits} bits")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "✅ Handshake complete! Quantum security: %d bits",
+                keypair.security_bits
+            )
         
         return {
             'shared_secret': shared_secret,
@@ -277,21 +539,29 @@ class HTTPQClient:
             'quantum_safe': True
         }
     
-    def _encrypt(self, data: Any, key: bytes) -> bytes:
+    def _encrypt(
+        self,
+        data: Any,
+        key: bytes,
+        *,
+        _payload_bytes=_payload_bytes
+    ) -> bytes:
         """Encrypt data with session key"""
         if data is None:
             return b''
         
-        plaintext = json.dumps(data).encode() if not isinstance(data, bytes) else data
-        
         # Use AES-256-GCM in production
         # Simplified for demo
-        encrypted = hashlib.sha256(plaintext + key).digest()
-        return encrypted
+        h = self._new_hash()
+        h.update(_payload_bytes(data))
+        h.update(key)
+        return h.digest()
 
 
 # Example usage
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    
     # Create HTTQ client
     client = HTTPQClient(algorithm='HTTQ-LATTICE-2048')
     
@@ -0,0 +1,78 @@
+"""Tests for HTTPQClient payload handling"""
+
+import json
+import unittest
+from unittest import mock
+
+import httq
+
+
+class PayloadBytesTest(unittest.TestCase):
+    """_payload_bytes serialization"""
+    
+    def test_bytes_and_str_pass_through(self):
+        self.assertEqual(httq._payload_bytes(b'\x00raw'), b'\x00raw')
+        self.assertEqual(httq._payload_bytes('café'), 'café'.encode())
+    
+    def test_json_is_compact_utf8(self):
+        self.assertEqual(
+            httq._payload_bytes({'name': 'café', 'ids': [1, 2]}),
+            '{"name":"café","ids":[1,2]}'.encode()
+        )
+    
+    def test_payloads_accepted_by_stdlib_json(self):
+        self.assertEqual(httq._payload_bytes({1: 'a'}), b'{"1":"a"}')
+        self.assertEqual(httq._payload_bytes({'a': 2 ** 70}), b'{"a":1180591620717411303424}')
+    
+    def test_float_encoding_round_trips(self):
+        self.assertEqual(httq._json_dumps([1e16, 0.1]), b'[1e+16,0.1]')
+        
+        encoded = httq._payload_bytes([1e16, 0.1])
+        self.assertIn(encoded, (b'[1e+16,0.1]', b'[1e16,0.1]'))
+        self.assertEqual(json.loads(encoded), [1e16, 0.1])
+    
+    def test_nan_encoding_per_backend(self):
+        payload = [float('nan'), float('inf')]
+        self.assertEqual(httq._json_dumps(payload), b'[NaN,Infinity]')
+        
+        expected = b'[null,null]' if getattr(httq, 'orjson', None) else b'[NaN,Infinity]'
+        self.assertEqual(httq._payload_bytes(payload), expected)
+    
+    def test_post_with_non_str_keys(self):
+        response = httq.HTTPQClient().post('httq://api.example.com', data={1: 'a'})
+        self.assertEqual(response['status'], 200)
+
+    
+    def test_lone_surrogates_are_accepted(self):
+        self.assertEqual(httq._payload_bytes('\ud800'), b'\xed\xa0\x80')
+        self.assertEqual(httq._payload_bytes({'x': '\ud800'}), b'{"x":"\xed\xa0\x80"}')
+        response = httq.HTTPQClient().post('httq://a', data={'x': '\ud800'})
+        self.assertEqual(response['status'], 200)
+
+
+class HTTPSSessionTest(unittest.TestCase):
+    """Pooled HTTPS fallback session lifecycle"""
+    
+    def test_close_releases_session(self):
+        session = mock.Mock()
+        client = httq.HTTPQClient()
+        client._https_session = session
+        
+        client.close()
+        
+        session.close.assert_called_once_with()
+        self.assertIsNone(client._https_session)
+    
+    def test_context_manager_closes(self):
+        session = mock.Mock()
+        with httq.HTTPQClient() as client:
+            client._https_session = session
+        
+        session.close.assert_called_once_with()
+    
+    def test_close_without_session(self):
+        httq.HTTPQClient().close()
+
+
+if __name__ == '__main__':
+    unittest.main()
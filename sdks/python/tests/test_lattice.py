@@ -0,0 +1,141 @@
+"""Tests for HTTPQLattice key pair generation"""
+
+import hashlib
+import threading
+import time
+import unittest
+from unittest import mock
+
+import httq
+from httq import HTTPQLattice
+
+
+class GenerateKeypairsTest(unittest.TestCase):
+    """HTTPQLattice.generate_keypairs"""
+    
+    def setUp(self):
+        self.lattice = HTTPQLattice(1024)
+    
+    def assert_valid(self, keypair):
+        self.assertEqual(len(keypair.private_key), 32)
+        self.assertEqual(
+            keypair.public_key,
+            hashlib.sha256(keypair.private_key + b'public').digest()
+        )
+        self.assertEqual(keypair.algorithm, 'HTTQ-LATTICE-1024')
+        self.assertEqual(keypair.security_bits, 128)
+    
+    def test_zero_count_returns_empty_list(self):
+        self.assertEqual(self.lattice.generate_keypairs(0), [])
+    
+    def test_single_keypair(self):
+        keypairs = self.lattice.generate_keypairs(1)
+        self.assertEqual(len(keypairs), 1)
+        self.assert_valid(keypairs[0])
+    
+    def test_large_batch_bypasses_pool(self):
+        count = httq._RAND_POOL.size // 32 + 1
+        with mock.patch.object(
+            httq.secrets, 'token_bytes', wraps=httq.secrets.token_bytes
+        ) as token_bytes:
+            keypairs = self.lattice.generate_keypairs(count)
+        
+        token_bytes.assert_called_once_with(32 * count)
+        self.assertEqual(len(keypairs), count)
+        for keypair in keypairs:
+            self.assert_valid(keypair)
+        private_keys = {keypair.private_key for keypair in keypairs}
+        self.assertEqual(len(private_keys), count)
+    
+    def test_negative_count_raises_and_keeps_pool_intact(self):
+        before = self.lattice.generate_keypair()
+        
+        with self.assertRaises(ValueError):
+            self.lattice.generate_keypairs(-1)
+        
+        after = self.lattice.generate_keypair()
+        self.assertNotEqual(after.private_key, before.private_key)
+        self.assertNotEqual(after.private_key, hashlib.sha256(b'').digest())
+
+
+class RandPoolTest(unittest.TestCase):
+    """_RandPool draws under concurrent resizing"""
+    
+    def tearDown(self):
+        httq.set_random_pool_size(4096)
+    
+    def test_shrink_while_draw_waits_on_lock(self):
+        pool = httq._RandPool(64)
+        results = []
+        
+        with pool.lock:
+            worker = threading.Thread(target=lambda: results.append(pool.take(32)))
+            worker.start()
+            time.sleep(0.05)
+            # Same field updates set_random_pool_size(0) makes under the lock
+            pool.size = 0
+            pool.buf = bytearray()
+            pool.off = 0
+        worker.join()
+        
+        self.assertEqual(len(results[0]), 32)
+        self.assertNotEqual(results[0], bytes(32))
+    
+    def test_resize_concurrently_with_draws(self):
+        stop = threading.Event()
+        draws = []
+        
+        def draw():
+            while not stop.is_set():
+                draws.append(httq._RAND_POOL.take(32))
+        
+        workers = [threading.Thread(target=draw) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for size in (0, 16, 4096, 32, 0, 64) * 50:
+            httq.set_random_pool_size(size)
+        stop.set()
+        for worker in workers:
+            worker.join()
+        
+        self.assertTrue(draws)
+        self.assertTrue(all(len(value) == 32 for value in draws))
+        self.assertNotIn(bytes(32), draws)
+
+
+class BoundDefaultsTest(unittest.TestCase):
+    """Hot-path helpers bound as defaults must not be positional"""
+    
+    def test_extra_positional_argument_is_rejected(self):
+        lattice = HTTPQLattice(1024)
+        public_key = lattice.generate_keypair().public_key
+        
+        with self.assertRaises(TypeError):
+            lattice.generate_keypairs(1, lambda n: bytes(n))
+        with self.assertRaises(TypeError):
+            lattice.encapsulate(public_key, lambda n: bytes(n))
+        with self.assertRaises(TypeError):
+            lattice.decapsulate(public_key, public_key, hashlib.md5)
+
+
+class SharedLatticeTest(unittest.TestCase):
+    """Lattices shared between clients through _lattice_for"""
+    
+    def test_clients_share_lattice_per_level(self):
+        first = httq.HTTPQClient('HTTQ-LATTICE-2048')
+        second = httq.HTTPQClient('HTTQ-LATTICE-2048')
+        self.assertIs(first.lattice, second.lattice)
+    
+    def test_shared_lattice_is_read_only(self):
+        lattice = httq.HTTPQClient('HTTQ-LATTICE-2048').lattice
+        
+        with self.assertRaises(AttributeError):
+            lattice.security_bits = 1
+        with self.assertRaises(AttributeError):
+            del lattice.q
+        self.assertEqual(lattice.security_bits, 192)
+        self.assertEqual(lattice.q, 7681)
+
+
+if __name__ == '__main__':
+    unittest.main()